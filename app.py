@@ -2,12 +2,18 @@
 import os
 import sys
 import threading
+import queue
+import collections
+import itertools
+import bisect
+from concurrent.futures import ThreadPoolExecutor
 import traceback
 import subprocess
 import re
+import csv
 import datetime
+import time
 from pathlib import Path
-from shutil import copy2
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import tkinter.ttk as ttk # Standard ttk for stability
@@ -22,15 +28,20 @@ except ImportError:
     from ttkbootstrap.toast import ToastNotification
 
 # App modules
-from utils import load_config, save_config, log_error, ensure_dirs, check_ollama_connection
-from parser import parse_resume
+from utils import load_config, save_config, log_error, ensure_dirs, check_ollama_connection, normalize_email, normalize_name, best_name_match, email_set, fast_copy, iter_resumes, file_digest
+from parser import iter_parsed_resumes, start_extract_pool
 from excel_handler import (
     validate_or_create_excel,
-    read_all_rows, append_row, 
-    update_status, export_by_status, DEFAULT_COLS
+    iter_all_rows, append_row, open_batch,
+    update_status, export_by_status, DEFAULT_COLS,
+    SNO_IDX, NAME_IDX, EMAIL_IDX, PHONE_IDX, EXP_IDX, STATUS_IDX,
+    load_content_hashes, add_content_hashes
 )
 from db_handler import CandidateDB
 
+# Extraction workers are forked now, while this is still the only thread
+start_extract_pool()
+
 # ----------------- Configuration / Workspace -----------------
 HOME = Path.home()
 WORKSPACE = HOME / "Desktop" / "ResumeParserWorkspace"
@@ -70,26 +81,108 @@ STATUS_OPTIONS = [
 ]
 
 # ----------------- Load Ollama model -----------------
-try:
-    success, model_or_error = check_ollama_connection()
-    if not success:
-        raise OSError(model_or_error)
-    MODEL_DISPLAY_NAME = f"Model: {model_or_error}"
-    nlp = None
-except Exception as e:
-    nlp = None
-    MODEL_DISPLAY_NAME = "Model: NOT LOADED"
-    log_error(f"Ollama connection error: {e}")
+# Checked lazily (first parse, or a background warm-up) so startup never waits on the server
+nlp = None
+MODEL_DISPLAY_NAME = "Model: checking..."
+_model_checked = False
+_model_lock = threading.Lock()
+
+def ensure_model():
+    """One-shot Ollama check; safe to call from any thread."""
+    global _model_checked, MODEL_DISPLAY_NAME
+    if _model_checked: return
+    with _model_lock:
+        if _model_checked: return
+        try:
+            success, model_or_error = check_ollama_connection()
+            if not success:
+                raise OSError(model_or_error)
+            MODEL_DISPLAY_NAME = f"Model: {model_or_error}"
+        except Exception as e:
+            MODEL_DISPLAY_NAME = "Model: NOT LOADED"
+            log_error(f"Ollama connection error: {e}")
+        _model_checked = True
+    ui_call(subtitle_lbl.config, text=f" | {MODEL_DISPLAY_NAME}")
 
 # ----------------- Globals -----------------
-PARSING_THREAD = None
+JOB_Q = queue.Queue() # Upload batches, drained one at a time by a single worker
+JOB_WORKER = None
+_jobs_pending = 0 # Queued + running batches (Tk thread only)
 STOP_EVENT = None
-CONFLICTS = []  # Store duplicate candidates for review
 THEME_NAME = "cosmo" # Default light theme
 
 # Cache for Treeview Data (Search Optimization)
 # Format: List of tuples/lists matching tree columns
 TREE_DATA_CACHE = [] 
+# Lower-cased search text for each cached row (same order as TREE_DATA_CACHE)
+TREE_SEARCH_CACHE = []
+# Tree iid of each cached row, None if it could not be inserted (same order)
+TREE_IIDS = []
+# S.No. -> position in the lists above (rows that made it into the tree)
+TREE_INDEX_BY_SNO = {}
+
+# Master DB (by_email, by_name) index, reused across batches while the DB file is unchanged
+CANDIDATE_INDEX = None
+CANDIDATE_INDEX_MTIME = None
+
+_EXP_RE = re.compile(r"[\d.]+")
+
+def _clean_experience(raw) -> str:
+    """First number in a parsed Experience value ("5.5 years" -> "5.5"), "0" if none."""
+    m = _EXP_RE.search(str(raw))
+    return m.group() if m else "0"
+
+def row_search_text(row):
+    """Lower-cased text a row is matched against (all fields except S.No)."""
+    return " ".join(map(str, row[1:])).lower() # One lower() on the joined string
+
+def query_matcher(q):
+    """Test for a row's search text: every space-separated term of q occurs in it, in any order."""
+    terms = q.split()
+    if len(terms) <= 1: return lambda text: q in text
+    return lambda text: all(t in text for t in terms)
+
+def cache_row(row):
+    """Adds a row to the cache and inserts it into the tree. Main thread only."""
+    global _attached
+    try:
+        iid = int(row[SNO_IDX])
+        tree.insert("", "end", iid=iid, values=row)
+        TREE_INDEX_BY_SNO[iid] = len(TREE_DATA_CACHE)
+    except (ValueError, TypeError, tk.TclError):
+        iid = None
+    TREE_DATA_CACHE.append(row)
+    TREE_SEARCH_CACHE.append(row_search_text(row))
+    TREE_IIDS.append(iid)
+    if iid is not None: _attached = None # Tree children changed
+    return iid
+
+def add_row(row):
+    """Caches a newly saved row, detaching it right away if it fails the search."""
+    add_rows((row,))
+
+def add_rows(rows):
+    """add_row for several rows at once: one query read, inserts back to back."""
+    q = current_query()
+    match = query_matcher(q)
+    hidden = []
+    for row in rows:
+        iid = cache_row(row)
+        if iid is not None and q and not match(TREE_SEARCH_CACHE[-1]):
+            hidden.append(iid)
+    if hidden: tree.detach(*hidden)
+
+# Rows saved by the worker wait here; flush_status inserts them every STATUS_FLUSH_MS
+_pending_rows = collections.deque()
+
+def queue_row(row): _pending_rows.append(row) # Any thread
+
+def flush_pending_rows():
+    rows = []
+    while _pending_rows: rows.append(_pending_rows.popleft())
+    if not rows: return
+    try: add_rows(rows)
+    except Exception as e: log_error(f"Tree insert failed: {e}")
 
 # ----------------- Duplicate Resolver Window -----------------
 class DuplicateResolver(tb.Toplevel):
@@ -107,6 +200,15 @@ class DuplicateResolver(tb.Toplevel):
         self.resolved_indices = set()
         self.current_index = 0
         
+        # DB/Excel writes run here, one at a time in click order, so clicks never wait on disk
+        self.writer = ThreadPoolExecutor(max_workers=1)
+        # Resolutions are appended to one shared batch, not a full workbook rewrite per click.
+        # It is opened (and only ever touched) on the writer, so the workbook load never blocks Tk.
+        self.batch = None
+        self.saved_hashes = [] # (content hash, S.No.) of resolved rows awaiting the batch save
+        self.closed = False
+        self.writer.submit(self._open_batch)
+        
         # Handle Window Close (X button) safely
         self.protocol("WM_DELETE_WINDOW", self.on_close_window)
         
@@ -243,18 +345,14 @@ class DuplicateResolver(tb.Toplevel):
         data = c['new']
         
         try:
+            db_data = None
             if update_db:
-                # Clean exp
-                try:
-                    exp_str = str(data.get("Experience", "0")).lower().replace("years", "").strip()
-                    matches = re.findall(r"[\d\.]+", exp_str)
-                    exp_val = matches[0] if matches else "0"
-                except: exp_val = "0"
-
-                target_email = data.get('Email')
-                if not target_email and c.get('old', {}).get('email'):
-                    target_email = c['old']['email']
-                    data['Email'] = target_email
+                exp_val = _clean_experience(data.get("Experience", "0"))
+
+                # Update the record the duplicate was matched to, by its stored key (the match may
+                # have been on one of several addresses, or on the name alone)
+                target_email = c['old']['email']
+                if not data.get('Email'): data['Email'] = target_email
 
                 db_data = {
                     'email': target_email,
@@ -263,25 +361,8 @@ class DuplicateResolver(tb.Toplevel):
                     'experience': str(exp_val),
                     'resume_path': data.get('ResumePath')
                 }
-                self.db.upsert_candidate(db_data, is_update=True)
-                
-            new_sno = append_row(self.excel_path, data, status=excel_status)
-            
-            # --- UPDATE MAIN UI CACHE & TREE ---
-            row_data = (
-                new_sno, data.get("Name"), data.get("Email"), data.get("Phone"),
-                data.get("Experience"), excel_status
-            )
-            # Add to global cache
-            TREE_DATA_CACHE.append(row_data)
-            
-            # Check if it passes current search filter
-            q = search_var.get().strip().lower()
-            row_str = " ".join([str(x).lower() for x in row_data[1:]])
             
-            if q == "" or q in row_str:
-                self.tree.insert("", "end", iid=new_sno, values=row_data)
-            # -----------------------------------
+            self.writer.submit(self._write, data, excel_status, db_data, c.get('hash'))
             
             self.listbox.itemconfig(self.current_index, {'bg': '#f0f0f0', 'fg': '#aaa'})
             self.resolved_indices.add(self.current_index)
@@ -303,12 +384,64 @@ class DuplicateResolver(tb.Toplevel):
             Messagebox.show_error(f"Error: {e}", "Action Failed", parent=self)
             log_error(f"Resolution error: {e}")
 
+    def _open_batch(self):
+        """Writer thread: loads the workbook once for every resolution in this dialog."""
+        try: self.batch = open_batch(self.excel_path)
+        except Exception as e:
+            log_error(f"Could not open Excel batch for resolver: {e}")
+
+    def _write(self, data, excel_status, db_data, digest):
+        """Writer thread: DB update + Excel row, then hands the row to the tree."""
+        try:
+            if db_data: self.db.upsert_candidate(db_data, is_update=True)
+            
+            if self.batch is not None:
+                new_sno = self.batch.append(data, status=excel_status)
+                if digest: self.saved_hashes.append((digest, new_sno)) # Recorded once committed
+            else:
+                new_sno = append_row(self.excel_path, data, status=excel_status)
+                if digest: self._add_hashes([(digest, new_sno)])
+            
+            # --- UPDATE MAIN UI CACHE & TREE ---
+            # Added to the cache (and the tree, if it passes the search filter) on the next flush
+            queue_row((
+                new_sno, data.get("Name"), data.get("Email"), data.get("Phone"),
+                data.get("Experience"), excel_status
+            ))
+        except Exception as e:
+            log_error(f"Resolution error: {e}")
+            ui_call(Messagebox.show_error, f"Could not save {data.get('Name', 'resolution')}: {e}", "Action Failed")
+
+    def _close_batch(self):
+        """Writer thread: saves pending resolutions and releases the batch."""
+        batch, self.batch = self.batch, None
+        if batch is None: return
+        try:
+            batch.commit()
+            self._add_hashes(self.saved_hashes)
+        except Exception as e:
+            ui_call(Messagebox.show_error, f"Could not save resolutions to Excel: {e}", "Excel Error")
+        finally:
+            batch.close()
+
+    def _add_hashes(self, hashes):
+        try: add_content_hashes(self.excel_path, hashes)
+        except Exception as e: log_error(f"Could not save content hashes: {e}")
+
     def keep_old(self):
         self._finalize_action("IGNORED", "Duplicate (Ignored)", update_db=False)
 
     def replace_new(self):
         self._finalize_action("UPDATED", "Re-Applicant (Updated)", update_db=True)
 
+    def destroy(self):
+        """Saves any pending resolutions (after queued writes) before the window goes away."""
+        if not self.closed:
+            self.closed = True
+            self.writer.submit(self._close_batch)
+            self.writer.shutdown(wait=False) # Queued writes still finish
+        super().destroy()
+
     def on_close_window(self):
         """Handle case where user closes window without resolving all."""
         unresolved = len(self.conflicts) - len(self.resolved_indices)
@@ -380,6 +513,9 @@ btn_stop = tb.Button(controls_frame, text="STOP", bootstyle="danger", command=la
 btn_export = tb.Button(controls_frame, text="Export Sorted", bootstyle="success-outline", command=lambda: export_sorted_files())
 btn_export.pack(side=RIGHT, padx=5)
 
+btn_csv = tb.Button(controls_frame, text="Export Visible → CSV", bootstyle="success-outline", command=lambda: export_visible_to_csv())
+btn_csv.pack(side=RIGHT, padx=5)
+
 btn_open_excel = tb.Button(controls_frame, text="Open Excel", bootstyle="info-outline", command=lambda: open_in_explorer(ACTIVE_EXCEL))
 btn_open_excel.pack(side=RIGHT, padx=5)
 
@@ -389,7 +525,8 @@ sec_bar.pack(fill=X)
 lbl_active = tb.Label(sec_bar, text=f"Active: {ACTIVE_EXCEL.name}", font=('Segoe UI', 9), bootstyle="secondary")
 lbl_active.pack(side=LEFT, padx=5)
 # Renamed button for clarity
-tb.Button(sec_bar, text="Create / Open Database", bootstyle="link", command=lambda: select_active_excel()).pack(side=LEFT)
+btn_select_db = tb.Button(sec_bar, text="Create / Open Database", bootstyle="link", command=lambda: select_active_excel())
+btn_select_db.pack(side=LEFT)
 
 tb.Label(sec_bar, text="Search:", bootstyle="secondary").pack(side=RIGHT, padx=(10, 5))
 entry_search = tb.Entry(sec_bar, textvariable=search_var, width=30)
@@ -456,10 +593,68 @@ current_selected_sno = None
 
 
 # ----------------- Functions -----------------
-def ui_call(fn, *a, **kw):
-    if root.winfo_exists(): root.after(0, lambda: fn(*a, **kw))
+# Calls posted from worker threads wait here and run in one drain per frame
+UI_FLUSH_MS = 16
+_ui_q = collections.deque()
+
+def ui_call(fn, *a, **kw): _ui_q.append((fn, a, kw))
 
-def add_status(text): ui_call(lbl_status.config, text=text)
+def drain_ui_calls():
+    """Runs queued UI calls on the Tk thread, merging back-to-back widget .config calls."""
+    root.after(UI_FLUSH_MS, drain_ui_calls)
+    
+    merged = []
+    while _ui_q:
+        fn, a, kw = _ui_q.popleft()
+        if (merged and not a and not merged[-1][1] and merged[-1][0] == fn
+                and getattr(fn, "__name__", "") in ("config", "configure")):
+            # Keep only the latest value per option
+            merged[-1] = (fn, a, {**merged[-1][2], **kw})
+        else:
+            merged.append((fn, a, kw))
+    
+    for fn, a, kw in merged:
+        try: fn(*a, **kw)
+        except Exception as e: log_error(f"UI call {getattr(fn, '__name__', fn)} failed: {e}\n{traceback.format_exc()}")
+
+# Status text and progress are posted by the worker and applied by a single
+# Tk timer, so a busy batch doesn't flood the event loop with callbacks.
+STATUS_FLUSH_MS = 100
+# Only the newest status line is ever shown, so workers just overwrite one slot
+_status_seq = itertools.count(1)
+_status_latest = (0, None)
+_status_shown = 0
+_progress_lock = threading.Lock()
+_progress_value = 0
+_progress_shown = 0
+
+def add_status(text):
+    global _status_latest
+    _status_latest = (next(_status_seq), text) # Single assignment, no lock needed
+
+def step_progress(n=1):
+    global _progress_value
+    with _progress_lock: _progress_value += n
+
+def set_progress(value):
+    global _progress_value
+    with _progress_lock: _progress_value = value
+
+def flush_status():
+    """Applies the latest queued status line and progress value, then re-arms."""
+    global _progress_shown, _status_shown
+    flush_pending_rows()
+    seq, text = _status_latest
+    if seq != _status_shown:
+        lbl_status.config(text=text)
+        _status_shown = seq
+    
+    with _progress_lock: value = _progress_value
+    if value != _progress_shown:
+        progress.config(value=value)
+        _progress_shown = value
+    
+    root.after(STATUS_FLUSH_MS, flush_status)
 
 def open_in_explorer(path):
     if os.path.exists(path):
@@ -473,10 +668,40 @@ def set_active_excel(path):
     CONFIG["active_excel"] = str(ACTIVE_EXCEL)
     save_config(CONFIG)
     lbl_active.config(text=f"Active: {ACTIVE_EXCEL.name}")
-    validate_or_create_excel(str(ACTIVE_EXCEL))
+    load_excel_in_background()
+
+def excel_loaded():
     refresh_tree_from_excel()
     ToastNotification(title="Database Loaded", message=f"Ready to save to: {ACTIVE_EXCEL.name}", duration=3000).show_toast()
 
+def load_excel_in_background():
+    """Validates the workbook off the Tk thread (window stays live); anything touching it waits until it is done."""
+    # Uploads, exports, status edits and switching workbooks all act on the file being validated
+    excel_buttons = (btn_single, btn_folder, btn_export, btn_csv, btn_open_excel, btn_save)
+    for b in excel_buttons + (btn_select_db,): b.config(state="disabled")
+    add_status(f"Loading {ACTIVE_EXCEL.name}...")
+    
+    def finish(error):
+        btn_select_db.config(state="normal") # Always a way out: pick another workbook
+        if error is not None:
+            # Nothing may write to a workbook that failed validation; it stays locked until one loads
+            add_status(f"Could not load {ACTIVE_EXCEL.name}: {error}")
+            Messagebox.show_error(f"Could not load {ACTIVE_EXCEL.name}:\n{error}\n\nSelect another workbook to continue.", "Excel Error")
+            return
+        for b in excel_buttons: b.config(state="normal")
+        excel_loaded()
+        add_status("Ready")
+    
+    def work():
+        try:
+            validate_or_create_excel(str(ACTIVE_EXCEL))
+            ui_call(finish, None)
+        except Exception as e:
+            log_error(f"Excel load failed: {e}")
+            ui_call(finish, e)
+    
+    threading.Thread(target=work, daemon=True).start()
+
 def select_active_excel():
     f = filedialog.asksaveasfilename(
         initialdir=str(EXCEL_DIR), 
@@ -491,26 +716,125 @@ def save_dup_config():
     save_config(CONFIG)
     add_status(f"Master Record Check: {'Enabled' if var_dup.get() else 'Disabled'}")
 
+TREE_INSERT_CHUNK = 500
+_tree_load_gen = 0
+
+# (path, mtime_ns) of the workbook the tree was last filled from
+_tree_stamp = None
+_tree_loading = False # A chunked full load is still running
+
+def excel_stamp(path):
+    try: return (path, os.stat(path).st_mtime_ns)
+    except OSError: return None
+
 def refresh_tree_from_excel():
-    """Reloads Excel data into Global Cache and repopulates Tree."""
-    global TREE_DATA_CACHE
+    """
+    Brings the tree in line with the active workbook. No-op if the file is
+    unchanged since the last load; same file changed -> diff by S.No.;
+    another file -> full reload in idle-time chunks.
+    """
+    global _tree_stamp
+    path = str(ACTIVE_EXCEL)
+    stamp = excel_stamp(path)
+    if stamp is not None and stamp == _tree_stamp: return
+    
+    if _tree_stamp and _tree_stamp[0] == path and not _tree_loading:
+        sync_tree_from_excel(path)
+    else:
+        reload_tree_from_excel(path)
+    _tree_stamp = stamp
+
+def reload_tree_from_excel(path):
+    """Clears the cache and tree, then streams every row back in."""
+    global TREE_DATA_CACHE, TREE_SEARCH_CACHE, TREE_IIDS, TREE_INDEX_BY_SNO, _tree_load_gen, _applied_query, _tree_loading
+    _tree_load_gen += 1 # Abandons any load still in progress
+    _tree_loading = True
+    
+    # Clear visual tree (detached rows included)
+    tree.delete(*[i for i in TREE_IIDS if i is not None])
     TREE_DATA_CACHE = [] # Clear cache
+    TREE_SEARCH_CACHE = []
+    TREE_IIDS = []
+    TREE_INDEX_BY_SNO = {}
+    forget_matches()
+    _applied_query = current_query()
     
-    # Clear visual tree
-    for r in tree.get_children(): tree.delete(r)
+    # Rows are streamed straight from the workbook into the cache
+    _load_tree_chunk(iter_all_rows(path), _tree_load_gen)
+
+def sync_tree_from_excel(path):
+    """Applies only what changed in the workbook: new, edited and removed S.No.s."""
+    global TREE_DATA_CACHE, TREE_SEARCH_CACHE, TREE_IIDS, TREE_INDEX_BY_SNO
+    seen = set()
+    new_rows = [] # Membership is decided in Python first; Tk is touched once per phase
+    changed = False
+    try:
+        for r in iter_all_rows(path):
+            try: sno = int(r[SNO_IDX])
+            except (ValueError, TypeError): continue
+            seen.add(sno)
+            row = r
+            i = TREE_INDEX_BY_SNO.get(sno)
+            if i is None:
+                new_rows.append(row)
+            elif tuple(TREE_DATA_CACHE[i]) != tuple(row):
+                old = TREE_DATA_CACHE[i]
+                TREE_DATA_CACHE[i] = row
+                TREE_SEARCH_CACHE[i] = row_search_text(row)
+                # Usually just Status was edited, so write only the cells that differ
+                for c, col in enumerate(tree_cols):
+                    if c >= len(old) or old[c] != row[c]: tree.set(sno, col, row[c])
+                changed = True
+    except Exception as e:
+        log_error(f"Excel read failed: {e}")
+        return
     
-    rows = read_all_rows(str(ACTIVE_EXCEL))
-    for r in rows:
-        r_list = list(r)
-        while len(r_list) < 6: r_list.append("")
-        
-        if r_list[0]: # Ensure Valid S.No
-            try:
-                # Add to Cache
-                TREE_DATA_CACHE.append(r_list[:6])
-                # Add to Tree (initially showing all)
-                tree.insert("", "end", iid=int(r_list[0]), values=r_list[:6])
-            except: pass
+    if new_rows: add_rows(new_rows)
+    
+    gone = [sno for sno in TREE_INDEX_BY_SNO if sno not in seen]
+    if gone:
+        tree.delete(*gone)
+        keep = [i for i, iid in enumerate(TREE_IIDS) if iid is None or iid in seen]
+        TREE_DATA_CACHE = [TREE_DATA_CACHE[i] for i in keep]
+        TREE_SEARCH_CACHE = [TREE_SEARCH_CACHE[i] for i in keep]
+        TREE_IIDS = [TREE_IIDS[i] for i in keep]
+        TREE_INDEX_BY_SNO = {iid: i for i, iid in enumerate(TREE_IIDS) if iid is not None}
+    if changed or gone:
+        forget_matches()
+        apply_search()
+
+def _load_tree_chunk(rows, gen):
+    """Inserts the next TREE_INSERT_CHUNK rows, then yields to the event loop."""
+    global _tree_loading
+    if gen != _tree_load_gen:
+        rows.close()
+        return
+    
+    q = current_query()
+    match = query_matcher(q)
+    loaded = 0
+    hidden = []
+    try:
+        for r in itertools.islice(rows, TREE_INSERT_CHUNK):
+            loaded += 1
+            # Rows come fixed-width from iter_all_rows; cached as is
+            if r[SNO_IDX]: # Ensure Valid S.No
+                try: int(r[SNO_IDX])
+                except (ValueError, TypeError): continue
+                iid = cache_row(r)
+                if iid is not None and q and not match(TREE_SEARCH_CACHE[-1]):
+                    hidden.append(iid)
+    except Exception as e:
+        log_error(f"Excel read failed: {e}")
+        _tree_loading = False
+        return
+    finally:
+        if hidden: tree.detach(*hidden) # One Tcl call for the whole chunk
+    
+    if loaded == TREE_INSERT_CHUNK:
+        root.after_idle(_load_tree_chunk, rows, gen)
+    else:
+        _tree_loading = False
 
 def on_tree_select(event):
     global current_selected_sno
@@ -518,13 +842,15 @@ def on_tree_select(event):
     if not sel: return
     try: current_selected_sno = int(sel)
     except: return
-    v = tree.item(sel, "values")
+    i = TREE_INDEX_BY_SNO.get(current_selected_sno)
+    if i is None: return
+    v = TREE_DATA_CACHE[i] # Same values the tree shows, without a Tcl round-trip
     if len(v) >= 6:
-        detail_name_var.set(v[1])
-        detail_email_var.set(v[2])
-        detail_phone_var.set(v[3])
-        detail_exp_var.set(v[4])
-        detail_status_var.set(v[5])
+        detail_name_var.set(v[NAME_IDX])
+        detail_email_var.set(v[EMAIL_IDX])
+        detail_phone_var.set(v[PHONE_IDX])
+        detail_exp_var.set(v[EXP_IDX])
+        detail_status_var.set(v[STATUS_IDX])
 
 tree.bind("<<TreeviewSelect>>", on_tree_select)
 
@@ -534,204 +860,409 @@ def save_candidate_status():
         return
     s = detail_status_var.get()
     if update_status(str(ACTIVE_EXCEL), current_selected_sno, s):
-        v = list(tree.item(current_selected_sno, "values"))
-        v[5] = s
-        tree.item(current_selected_sno, values=tuple(v))
+        tree.set(current_selected_sno, "Status", s) # One cell; the row itself lives in the cache
         
-        # Update Cache too!
-        for i, row in enumerate(TREE_DATA_CACHE):
-            if int(row[0]) == current_selected_sno:
-                new_row = list(row)
-                new_row[5] = s
-                TREE_DATA_CACHE[i] = tuple(new_row)
-                break
+        # Update Cache too! (by S.No. index, no scan)
+        i = TREE_INDEX_BY_SNO.get(current_selected_sno)
+        if i is not None:
+            new_row = list(TREE_DATA_CACHE[i])
+            new_row[STATUS_IDX] = s
+            TREE_DATA_CACHE[i] = tuple(new_row)
+            TREE_SEARCH_CACHE[i] = row_search_text(new_row)
+            forget_matches()
                 
         add_status(f"Status saved for #{current_selected_sno}")
     else:
         Messagebox.show_error("Could not save status to Excel.", "Error")
 
+def current_query():
+    return search_var.get().strip().lower()
+
+# (query, matching indices, rows scanned) from the last search, for narrowing
+_match_memo = None
+
+def matching_indices():
+    """Cache indices of the rows that pass the current search (i.e. visible rows)."""
+    global _match_memo
+    q = current_query()
+    if q == "":
+        _match_memo = None
+        return [i for i, iid in enumerate(TREE_IIDS) if iid is not None]
+    
+    # Typing onto the last query can only narrow it (each old term is inside a new one):
+    # rescan just its matches + rows added since
+    search, iids = TREE_SEARCH_CACHE, TREE_IIDS
+    match = query_matcher(q)
+    if _match_memo and _match_memo[0] in q and _match_memo[2] <= len(search):
+        prev_q, prev, scanned = _match_memo
+        candidates = itertools.chain(prev, range(scanned, len(search)))
+        matches = [i for i in candidates if iids[i] is not None and match(search[i])]
+    else:
+        # Several terms: the longest (rarest) one drives the C-level scan, the rest filter its hits
+        terms = q.split()
+        hits = scan_haystack(max(terms, key=len))
+        if len(terms) > 1: hits = [i for i in hits if match(search[i])]
+        matches = [i for i in hits if iids[i] is not None]
+    
+    _match_memo = (q, matches, len(search))
+    return matches
+
+# All search texts joined by NUL (never typed into the box), so a full scan is
+# str.find in C hopping from hit to hit instead of a Python loop over every row
+_haystack = None # (cache key, text, cumulative row ends)
+_search_version = 0
+
+def search_haystack():
+    global _haystack
+    key = (id(TREE_SEARCH_CACHE), len(TREE_SEARCH_CACHE), _search_version)
+    if _haystack is None or _haystack[0] != key:
+        # ends[i] = offset just past row i's separator = where row i+1 starts
+        ends = list(itertools.accumulate(map((1).__add__, map(len, TREE_SEARCH_CACHE))))
+        _haystack = (key, "\x00".join(TREE_SEARCH_CACHE), ends)
+    return _haystack[1], _haystack[2]
+
+def scan_haystack(q):
+    """Cache indices whose search text contains q, in order."""
+    hay, ends = search_haystack()
+    find = hay.find
+    out = []
+    pos = find(q)
+    while pos != -1:
+        i = bisect.bisect_right(ends, pos)
+        out.append(i)
+        pos = find(q, ends[i]) # Resume at the next row
+    return out
+
+def forget_matches():
+    """Drop the narrowing memo (cache reloaded or a row's text changed)."""
+    global _match_memo, _attached, _search_version
+    _match_memo = None
+    _attached = None
+    _search_version += 1
+
+_applied_query = ""
+# iids attached by the last apply_search; None once rows were added/removed since
+_attached = None
+
+def apply_search():
+    """Attaches matching rows (in cache order) and detaches the rest in one Tk call."""
+    global _applied_query, _attached
+    _applied_query = current_query()
+    iids = [TREE_IIDS[i] for i in matching_indices()]
+    if iids == _attached: return # Same rows visible, e.g. an extra letter that filtered nothing out
+    tree.set_children("", *iids)
+    _attached = iids
+
+SEARCH_DEBOUNCE_MS = 150
+_search_after_id = None
+
 def on_search_change(*_):
-    """Refilters tree based on cache."""
-    q = search_var.get().strip().lower()
-    
-    # 1. Clear visible tree
-    for k in tree.get_children():
-        tree.detach(k) # Detach is faster than delete for reloading? 
-                       # Actually, delete is safer to clear view.
-        tree.delete(k)
-
-    # 2. Re-insert matches from cache
-    for row in TREE_DATA_CACHE:
-        row_text = " ".join([str(x).lower() for x in row[1:]]) # search all fields except S.No
-        if q == "" or q in row_text:
-            try:
-                tree.insert("", "end", iid=int(row[0]), values=row)
-            except tk.TclError: pass 
+    """Refilters tree based on cache, once typing pauses."""
+    global _search_after_id
+    if _search_after_id: root.after_cancel(_search_after_id)
+    _search_after_id = root.after(SEARCH_DEBOUNCE_MS, _run_search)
+
+def _run_search():
+    global _search_after_id
+    _search_after_id = None
+    # Keys that don't change the query (arrows, shift, ...) leave the view as is
+    if current_query() != _applied_query: apply_search()
 
 entry_search.bind("<KeyRelease>", on_search_change)
 
-def safe_copy_to_workspace(src_path: str):
+COPY_WORKERS = 8
+_name_lock = threading.Lock()
+
+def list_workspace_names():
+    """Names already used in RESUMES_DIR (normcased), read with one scandir."""
+    with os.scandir(RESUMES_DIR) as it:
+        return {os.path.normcase(e.name) for e in it}
+
+def safe_copy_to_workspace(src_path: str, taken_names=None):
+    """
+    Copies a resume into RESUMES_DIR under a free name.
+    taken_names: optional set from list_workspace_names(); names are picked
+    from it (and added to it) instead of stat-ing the folder per candidate.
+    """
     src = Path(src_path)
-    dst = RESUMES_DIR / src.name
-    base = dst.stem
-    ext = dst.suffix
-    i = 1
-    while dst.exists():
-        dst = RESUMES_DIR / f"{base}_{i}{ext}"
-        i += 1
-    copy2(src, dst)
+    base = src.stem
+    ext = src.suffix
+    name = src.name
+    
+    if taken_names is None:
+        is_taken = lambda n: (RESUMES_DIR / n).exists()
+    else:
+        is_taken = lambda n: os.path.normcase(n) in taken_names
+    
+    # Name reservation is locked so concurrent copies never pick the same name
+    with _name_lock:
+        i = 1
+        while is_taken(name):
+            name = f"{base}_{i}{ext}"
+            i += 1
+        if taken_names is not None: taken_names.add(os.path.normcase(name))
+    
+    # Plain content copy; the workspace copy doesn't need the source metadata
+    dst = RESUMES_DIR / name
+    fast_copy(src, dst)
     return dst
 
 # ----------------- Processing Logic -----------------
+def db_mtime():
+    try: return os.stat(DB.db_path).st_mtime_ns
+    except OSError: return None
+
+def get_candidate_index():
+    """Cached DB.load_candidate_index(); reloaded only if the DB file changed (e.g. resolver updates)."""
+    global CANDIDATE_INDEX, CANDIDATE_INDEX_MTIME
+    mtime = db_mtime()
+    if CANDIDATE_INDEX is None or mtime != CANDIDATE_INDEX_MTIME:
+        CANDIDATE_INDEX = DB.load_candidate_index()
+        CANDIDATE_INDEX_MTIME = mtime
+    return CANDIDATE_INDEX
+
+# Placeholder DB keys for resumes without an email: unique per run (ns start time + PID) and within it (counter)
+_NO_EMAIL_SEQ = itertools.count(1)
+_RUN_STAMP = f"{time.time_ns():x}_{os.getpid()}"
+
 def process_files_sequential(raw_paths, check_db, stop_event):
-    global CONFLICTS
-    CONFLICTS = [] 
+    conflicts = [] # Duplicates staged for review; this job's own list, handed to its resolver
+    
+    if not _model_checked:
+        add_status("Loading model...")
+        ensure_model()
     
-    ui_call(progress.config, mode="indeterminate")
-    add_status(f"Preparing {len(raw_paths)} files...")
+    total = len(raw_paths)
+    set_progress(0)
+    ui_call(progress.config, mode="determinate", maximum=total, value=0)
+    add_status(f"Importing {total} files...")
     sys.stdout.flush()
     
-    processed_paths = []
-    stopped_during_copy = False
+    taken_names = list_workspace_names()
     
-    for i, fp in enumerate(raw_paths):
-        if stop_event.is_set(): 
-            stopped_during_copy = True
-            break
+    # Files whose exact content was imported into this workbook before are skipped outright
+    seen_hashes = load_content_hashes(str(ACTIVE_EXCEL))
+    path_hashes = {} # workspace copy -> content hash
+    cnt_skip = 0
+    
+    def copy_one(fp):
+        if stop_event.is_set(): return None, None
         try:
-            if i % 10 == 0: add_status(f"Copying file {i+1}...")
-            dst = safe_copy_to_workspace(fp)
-            processed_paths.append(str(dst))
+            digest = file_digest(fp)
+            if digest in seen_hashes: return None, digest
+            return str(safe_copy_to_workspace(fp, taken_names)), digest
         except Exception as e:
             print(f"[Error] Copy failed for {fp}: {e}")
             log_error(f"Copy error: {e}")
-
-    if stopped_during_copy:
-        ui_call(parsing_complete, 0, 0, 0, 0, True)
-        return
-
-    ui_call(progress.config, mode="determinate", maximum=len(processed_paths), value=0)
-    add_status(f"Parsing {len(processed_paths)} resumes...")
+            return None, None
+    
+    def copied_paths():
+        """
+        Workspace copies, in input order, handed to the parser as they land: copying runs
+        ahead on a small thread pool while earlier files are already being parsed.
+        """
+        nonlocal cnt_skip
+        with ThreadPoolExecutor(max_workers=max(1, min(COPY_WORKERS, total))) as pool:
+            for dst, digest in pool.map(copy_one, raw_paths):
+                if digest and (dst is None or digest in seen_hashes):
+                    # Already imported, or the same file twice in this upload
+                    if dst:
+                        try: os.remove(dst)
+                        except OSError: pass
+                    cnt_skip += 1
+                    step_progress()
+                    continue
+                if not dst:
+                    step_progress() # Copy failed (logged) or stopped
+                    continue
+                seen_hashes.add(digest)
+                path_hashes[dst] = digest
+                yield dst
     
     cnt_new, cnt_fail, cnt_dup = 0, 0, 0
-    stopped_during_parse = False
+    imported_hashes = []
     
-    for i, fp in enumerate(processed_paths):
-        if stop_event.is_set(): 
-            stopped_during_parse = True
-            break
-        
-        fname = Path(fp).name
-        print(f"[{i+1}/{len(processed_paths)}] Parsing: {fname}")
-        sys.stdout.flush()
-        
-        try:
-            add_status(f"Processing ({i+1}): {fname}")
-            data = parse_resume(fp)
-            if not data:
-                print(f"  -> Failed to parse {fname}")
-                cnt_fail += 1
-                ui_call(progress.step, 1)
-                continue
-
-            email = data.get("Email", "").strip().lower()
-            if isinstance(email, list): email = email[0] if email else ""
-            
-            try:
-                exp_str = str(data.get("Experience", "0")).lower().replace("years", "").strip()
-                matches = re.findall(r"[\d\.]+", exp_str)
-                exp_val = matches[0] if matches else "0"
-            except: exp_val = "0"
-            data['Experience'] = exp_val 
-
-            is_conflict = False
-            existing_record = None
+    # Master DB emails/names are loaded once per session and kept current as rows are added
+    email_index, name_index = get_candidate_index() if check_db else ({}, {})
+    records = {} # stored email -> DB record, fetched at most once per batch
+    db_pending = [] # New candidates, written by each save of the Excel batch (one transaction each)
+    
+    def flush_db():
+        global CANDIDATE_INDEX
+        if not db_pending: return
+        DB.insert_candidates(db_pending)
+        db_pending.clear()
+        CANDIDATE_INDEX = None # This batch keeps its own copy current; the next one reloads
+    
+    def get_record(stored_email):
+        if stored_email not in records: records[stored_email] = DB.get_candidate(stored_email)
+        return records[stored_email]
+    
+    # One workbook handle for the whole batch; rows are saved once at the end
+    try:
+        excel_batch = open_batch(str(ACTIVE_EXCEL))
+    except Exception as e:
+        log_error(f"Could not open Excel for batch: {e}")
+        ui_call(Messagebox.show_error, f"Could not open Excel file: {e}", "Excel Error")
+        ui_call(parsing_complete, 0, 0, total, 0, False)
+        return
+    
+    # Every save of the batch (checkpoint, resolver or status edit) writes our DB rows first
+    excel_batch.commit_hooks.append(flush_db)
+    with excel_batch:
+        # Text is extracted batch-wise first, then fields are pulled per resume
+        for i, (fp, data) in enumerate(iter_parsed_resumes(
+                copied_paths(), ocr=CONFIG.get("ocr_enabled", True), use_gpu=CONFIG.get("use_gpu", True),
+                llm_workers=CONFIG.get("parse_workers", 4), digests=path_hashes)):
+            if stop_event.is_set(): break
             
-            if check_db:
-                # 1. Check by Email
-                if email:
-                    existing_record = DB.get_candidate(email)
-                
-                # 2. Check by Name if not found by email or email missing
-                if not existing_record and data.get("Name"):
-                    name_matches = DB.get_candidates_by_name(data.get("Name"))
-                    if name_matches:
-                        existing_record = name_matches[0]
-                        data['inferred_from_name'] = True
-                        print(f"  -> Match by Name found: {existing_record['email']}")
-
-                if existing_record:
-                    is_conflict = True
-                    print(f"  -> DUPLICATE FOUND. Staging.")
-                    CONFLICTS.append({"new": data, "old": existing_record, "file": fp})
-                    cnt_dup += 1
+            fname = Path(fp).name
+            print(f"[{i+1}/{total}] Parsing: {fname}")
             
-            if not is_conflict:
-                print(f"  -> New Candidate. Saving.")
-                save_email = email if email else f"no_email_{os.urandom(4).hex()}"
-                
-                db_data = {
-                    'email': save_email, 'name': data.get('Name'), 'phone': data.get('Phone'),
-                    'experience': str(exp_val), 'resume_path': data.get('ResumePath')
-                }
-                if check_db: DB.upsert_candidate(db_data, is_update=False)
-                new_sno = append_row(str(ACTIVE_EXCEL), data, status="New Applicant")
-                
-                # UPDATE UI & CACHE
-                row_data = (
-                    new_sno, data.get("Name"), data.get("Email"), data.get("Phone"),
-                    data.get("Experience"), "New Applicant"
-                )
-                TREE_DATA_CACHE.append(row_data)
+            try:
+                add_status(f"Processing ({i+1}): {fname}")
+                if isinstance(data, Exception):
+                    raise data
+                if not data:
+                    print(f"  -> Failed to parse {fname}")
+                    cnt_fail += 1
+                    continue
+
+                email = normalize_email(data.get("Email")) # New-applicant DB key; Email stays for display
+                emails = email_set(data.get("Email")) # Every address, canonicalized once
                 
-                # Update visible tree if matches search
-                q_curr = search_var.get().strip().lower()
-                row_str = " ".join([str(x).lower() for x in row_data[1:]])
-                if q_curr == "" or q_curr in row_str:
-                    ui_call(tree.insert, "", "end", iid=new_sno, values=row_data)
+                exp_val = _clean_experience(data.get("Experience", "0"))
+                data['Experience'] = exp_val
+
+                is_conflict = False
+                existing_record = None
                 
-                cnt_new += 1
+                if check_db:
+                    # 1. Check by Email (any of the parsed addresses, one C-level set intersection)
+                    hits = emails & email_index.keys()
+                    if hits:
+                        key = email if email in hits else min(hits)
+                        existing_record = get_record(email_index[key]) # Only hits touch the DB
+                    
+                    # 2. Check by Name if not found by email or email missing
+                    if not existing_record and data.get("Name"):
+                        key = normalize_name(data.get("Name"))
+                        if key not in name_index: key = best_name_match(key, name_index.keys()) # Near-miss spellings
+                        name_match = get_record(name_index[key]) if key else None
+                        if name_match:
+                            existing_record = name_match
+                            data['inferred_from_name'] = True
+                            print(f"  -> Match by Name found: {existing_record['email']}")
+
+                    if existing_record:
+                        is_conflict = True
+                        print(f"  -> DUPLICATE FOUND. Staging.")
+                        conflicts.append({"new": data, "old": existing_record, "file": fp, "hash": path_hashes.get(fp)})
+                        cnt_dup += 1
                 
-        except Exception as e:
-            print(f"  -> ERROR processing {fname}: {e}")
-            cnt_fail += 1
-        finally:
-            ui_call(progress.step, 1)
-
-    ui_call(progress.config, value=0)
-    ui_call(parsing_complete, cnt_new, cnt_dup, cnt_fail, 0, stopped_during_parse)
-
-def parsing_complete(new, dup, fail, up, stopped):
-    global PARSING_THREAD, STOP_EVENT
-    PARSING_THREAD = None
-    STOP_EVENT = None
+                if not is_conflict:
+                    print(f"  -> New Candidate. Saving.")
+                    save_email = email if email else f"no_email_{_RUN_STAMP}_{next(_NO_EMAIL_SEQ)}"
+                    
+                    db_data = {
+                        'email': save_email, 'name': data.get('Name'), 'phone': data.get('Phone'),
+                        'experience': str(exp_val), 'resume_path': data.get('ResumePath')
+                    }
+                    if check_db:
+                        # Not in the DB until the next flush; later files in this batch match this record
+                        records[save_email] = dict(db_data, application_count=1,
+                            last_applied_date=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                        email_index[save_email] = save_email
+                        for e in emails: email_index.setdefault(e, save_email)
+                        if data.get("Name"): name_index.setdefault(normalize_name(data.get("Name")), save_email)
+                    with excel_batch.lock: # Queued together, so no save can take the row without its DB record
+                        if check_db: db_pending.append(db_data)
+                        new_sno = excel_batch.append(data, status="New Applicant")
+                    if fp in path_hashes: imported_hashes.append((path_hashes[fp], new_sno))
+                    
+                    # UPDATE UI & CACHE
+                    row_data = (
+                        new_sno, data.get("Name"), data.get("Email"), data.get("Phone"),
+                        data.get("Experience"), "New Applicant"
+                    )
+                    queue_row(row_data)
+                    
+                    cnt_new += 1
+                    
+            except Exception as e:
+                print(f"  -> ERROR processing {fname}: {e}")
+                cnt_fail += 1
+            finally:
+                step_progress()
+
+        with excel_batch.lock:
+            excel_batch.commit_hooks.remove(flush_db) # The batch may outlive this job (resolver)
+            flush_db()
+        saved = True
+        if excel_batch.pending:
+            add_status(f"Saving {excel_batch.pending} rows to Excel...")
+            try:
+                excel_batch.commit()
+            except Exception as e:
+                saved = False
+                ui_call(Messagebox.show_error, f"Could not save new rows to Excel: {e}", "Excel Error")
     
-    btn_single.config(state="normal")
-    btn_folder.config(state="normal")
+    # Only remember content whose row actually made it into the workbook (staged
+    # duplicates are recorded by the resolver once their row is saved)
+    if saved:
+        try: add_content_hashes(str(ACTIVE_EXCEL), imported_hashes)
+        except Exception as e: log_error(f"Could not save content hashes: {e}")
+
+    set_progress(0)
+    ui_call(parsing_complete, cnt_new, cnt_dup, cnt_fail, 0, stop_event.is_set(), cnt_skip, conflicts)
+
+def job_finished():
+    """One batch left the queue; restores the idle UI once the queue is empty."""
+    global _jobs_pending, STOP_EVENT
+    _jobs_pending -= 1
+    if _jobs_pending > 0:
+        add_status(f"{_jobs_pending} batch(es) still queued.")
+        return
+    _jobs_pending = 0
+    STOP_EVENT = None
     btn_stop.pack_forget()
-    
+
+def parsing_complete(new, dup, fail, up, stopped, skipped=0, conflicts=()):
+    flush_pending_rows() # Batch rows go in before the summary / resolver
+    job_finished()
     add_status("Batch Processing Complete.")
     
     summary = f"New Candidates: {new}\nParsing Failures: {fail}\nDuplicates: {dup}"
+    if skipped: summary += f"\nSkipped (already imported): {skipped}"
     
     if stopped:
         summary = "Processing stopped by user.\n\n" + summary
     
-    if dup > 0:
+    if conflicts:
         try:
             Messagebox.show_info(f"{summary}\n\nDuplicates found. Opening Resolver.", "Results")
-            DuplicateResolver(root, CONFLICTS, DB, ACTIVE_EXCEL, tree)
+            DuplicateResolver(root, conflicts, DB, ACTIVE_EXCEL, tree)
         except Exception as e:
             messagebox.showerror("UI Error", f"Could not open resolver: {e}")
             log_error(f"Resolver crash: {e}")
     else:
         Messagebox.show_info(summary, "Results")
 
+def job_worker():
+    """Single long-lived consumer: batches run one after another, so only one writer touches the Excel file."""
+    while True:
+        paths, check_db, stop_event = JOB_Q.get()
+        try:
+            if stop_event.is_set(): ui_call(job_finished) # Stopped while still queued
+            else: process_files_sequential(paths, check_db, stop_event)
+        except Exception as e:
+            log_error(f"Batch worker error: {e}\n{traceback.format_exc()}")
+            ui_call(job_finished)
+        finally:
+            JOB_Q.task_done()
+
 def on_upload(mode):
-    global PARSING_THREAD, STOP_EVENT
-    if PARSING_THREAD: 
-        Messagebox.show_warning("Parsing is already in progress.", "Busy")
-        return
+    global JOB_WORKER, STOP_EVENT, _jobs_pending
     
     paths = []
     if mode == "file":
@@ -739,27 +1270,65 @@ def on_upload(mode):
         if f: paths=[f]
     elif mode == "folder":
         d = filedialog.askdirectory()
-        if d: paths=[str(p) for p in Path(d).rglob("*") if p.suffix.lower() in ['.pdf', '.docx']]
+        if d: paths=list(iter_resumes(d))
     
     if not paths: return
     
-    STOP_EVENT = threading.Event()
-    btn_single.config(state="disabled")
-    btn_folder.config(state="disabled")
+    if STOP_EVENT is None or STOP_EVENT.is_set(): STOP_EVENT = threading.Event()
     btn_stop.pack(side=LEFT, padx=10)
     
-    PARSING_THREAD = threading.Thread(
-        target=process_files_sequential,
-        args=(paths, var_dup.get(), STOP_EVENT),
-        daemon=True
-    )
-    PARSING_THREAD.start()
+    if JOB_WORKER is None:
+        JOB_WORKER = threading.Thread(target=job_worker, daemon=True)
+        JOB_WORKER.start()
+    
+    _jobs_pending += 1
+    if _jobs_pending > 1: add_status(f"Batch queued ({_jobs_pending - 1} ahead).")
+    JOB_Q.put((paths, var_dup.get(), STOP_EVENT))
 
 def on_stop_parsing():
     if STOP_EVENT: 
         STOP_EVENT.set()
         add_status("Stopping... please wait.")
 
+def export_visible_to_csv():
+    """Writes the rows matching the current search to CSV on a worker thread."""
+    f = filedialog.asksaveasfilename(
+        title="Export Visible Rows",
+        defaultextension=".csv",
+        filetypes=[("CSV Files", "*.csv")]
+    )
+    if not f: return
+    rows = None
+    if not _tree_loading and _tree_stamp and _tree_stamp[0] == str(ACTIVE_EXCEL):
+        # The cache already holds the workbook (plus rows not yet saved): no re-read
+        flush_pending_rows()
+        rows = [TREE_DATA_CACHE[i] for i in matching_indices()]
+    threading.Thread(target=_write_csv, args=(f, str(ACTIVE_EXCEL), current_query(), rows), daemon=True).start()
+
+def _write_csv(save_path, excel_path, q, rows=None):
+    count = 0
+    match = query_matcher(q)
+    def visible_rows():
+        nonlocal count
+        if rows is not None:
+            count = len(rows)
+            yield from rows
+            return
+        for r in iter_all_rows(excel_path):
+            if not q or match(row_search_text(r)):
+                count += 1
+                yield r
+    
+    try:
+        with open(save_path, "w", buffering=1 << 20, newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(DEFAULT_COLS)
+            writer.writerows(visible_rows())
+        ui_call(Messagebox.show_info, f"Exported {count} rows.", "Success")
+    except Exception as e:
+        log_error(f"CSV export failed: {e}")
+        ui_call(Messagebox.show_error, f"Could not export CSV: {e}", "Export Failed")
+
 def export_sorted_files():
     d = filedialog.askdirectory()
     if d:
@@ -772,11 +1341,14 @@ try: set_active_excel(ACTIVE_EXCEL)
 except: pass
 
 def on_close():
-    if PARSING_THREAD:
+    if _jobs_pending:
         if Messagebox.show_question("Parsing in progress. Quit?", "Exit", buttons=['No:secondary', 'Yes:danger']) == 'Yes':
             root.destroy()
     else:
         root.destroy()
 
 root.protocol("WM_DELETE_WINDOW", on_close)
+root.after(STATUS_FLUSH_MS, flush_status)
+root.after(UI_FLUSH_MS, drain_ui_calls)
+threading.Thread(target=ensure_model, daemon=True).start() # Warm up off the UI thread
 root.mainloop()
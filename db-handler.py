@@ -1,7 +1,7 @@
 import sqlite3
 import datetime
 from pathlib import Path
-from utils import log_error
+from utils import log_error, normalize_email, normalize_name
 
 DB_FILE = Path.home() / "Desktop" / "ResumeParserWorkspace" / "master_candidates.db"
 
@@ -50,21 +50,57 @@ class CandidateDB:
             log_error(f"DB Fetch Error: {e}")
             return None
 
-    def get_candidates_by_name(self, name: str):
-        """Fetch candidates by Name (Non-Unique). Returns a list."""
-        if not name: return []
+    def load_candidate_index(self):
+        """
+        Fetch every candidate key in one query, indexed for a whole batch of lookups.
+        Returns (by_email, by_name): normalized email -> stored email,
+        normalized name -> stored email of the first match. Only keys are held in
+        memory; the full record of a hit comes from get_candidate().
+        """
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
-            # Case-insensitive search
-            cursor.execute("SELECT * FROM candidates WHERE lower(name) = ?", (name.lower(),))
+            cursor.execute("SELECT email, name FROM candidates")
             rows = cursor.fetchall()
             conn.close()
             
-            return [self._row_to_dict(r) for r in rows]
+            by_email, by_name = {}, {}
+            for email, name in rows:
+                by_email[normalize_email(email)] = email
+                if name: by_name.setdefault(normalize_name(name), email)
+            return by_email, by_name
+        except Exception as e:
+            log_error(f"DB Index Load Error: {e}")
+            return {}, {}
+
+    def insert_candidates(self, rows) -> int:
+        """
+        Insert many new candidates in one transaction (one commit/fsync for the lot).
+        rows: dicts as for upsert_candidate. An email already present (e.g. added by another
+        batch since the index was loaded) is updated the way upsert_candidate(is_update=True) does.
+        Returns the number of rows written.
+        """
+        if not rows: return 0
+        try:
+            conn = sqlite3.connect(self.db_path)
+            current_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with conn:
+                before = conn.total_changes
+                conn.executemany('''
+                    INSERT INTO candidates (email, name, phone, experience, last_applied_date, resume_path, application_count)
+                    VALUES (?, ?, ?, ?, ?, ?, 1)
+                    ON CONFLICT(email) DO UPDATE SET
+                        name = excluded.name, phone = excluded.phone, experience = excluded.experience,
+                        last_applied_date = excluded.last_applied_date, resume_path = excluded.resume_path,
+                        application_count = application_count + 1
+                ''', [(normalize_email(d['email']), d['name'], d['phone'], d['experience'], current_date, d['resume_path'])
+                      for d in rows])
+                written = conn.total_changes - before
+            conn.close()
+            return written
         except Exception as e:
-            log_error(f"DB Fetch By Name Error: {e}")
-            return []
+            log_error(f"DB Bulk Insert Error: {e}")
+            return 0
 
     def _row_to_dict(self, row):
         return {
@@ -95,11 +131,11 @@ class CandidateDB:
                     WHERE email = ?
                 ''', (data['name'], data['phone'], data['experience'], current_date, data['resume_path'], data['email']))
             else:
-                # Insert new record
+                # Insert new record (email stored in canonical form, so it is its own index key)
                 cursor.execute('''
                     INSERT INTO candidates (email, name, phone, experience, last_applied_date, resume_path, application_count)
                     VALUES (?, ?, ?, ?, ?, ?, 1)
-                ''', (data['email'], data['name'], data['phone'], data['experience'], current_date, data['resume_path']))
+                ''', (normalize_email(data['email']), data['name'], data['phone'], data['experience'], current_date, data['resume_path']))
 
             conn.commit()
             conn.close()
@@ -1,27 +1,45 @@
 import os
+import re
+import time
+import threading
 from openpyxl import Workbook, load_workbook
-from openpyxl.utils.exceptions import InvalidFileException
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.utils import get_column_letter
 import zipfile 
+from contextlib import closing
+from functools import lru_cache
 from utils import log_error
 
+# Optional: xlsxwriter streams whole new workbooks faster than openpyxl
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 # --- UPDATED COLUMNS ---
 DEFAULT_COLS = ["S.No.", "Name", "Email", "Phone", "Experience", "Status"]
+# Column positions in DEFAULT_COLS (0-based), resolved once
+COL_IDX = {c: i for i, c in enumerate(DEFAULT_COLS)}
+SNO_IDX, NAME_IDX, EMAIL_IDX, PHONE_IDX, EXP_IDX, STATUS_IDX = (
+    COL_IDX[c] for c in ("S.No.", "Name", "Email", "Phone", "Experience", "Status"))
+
+# Status options including new Re-Applicant statuses
+STATUS_OPTIONS = [
+    "New Applicant", "Re-Applicant (Updated)", "Duplicate (Ignored)",
+    "Accepted", "Rejected", "On Hold", 
+    "Interview Scheduled", "Pending Review"
+]
+
+def _status_validation() -> DataValidation:
+    dv = DataValidation(type="list", formula1=f'"{",".join(STATUS_OPTIONS)}"', allow_blank=True)
+    dv.error = "Your entry is not in the list."
+    dv.errorTitle = "Invalid Entry"
+    return dv
 
 def _apply_dropdown_validation(ws):
     """Applies data validation dropdowns to the 'Status' column."""
     try:
-        # Status options including new Re-Applicant statuses
-        STATUS_OPTIONS = [
-            "New Applicant", "Re-Applicant (Updated)", "Duplicate (Ignored)",
-            "Accepted", "Rejected", "On Hold", 
-            "Interview Scheduled", "Pending Review"
-        ]
-        
-        dv = DataValidation(type="list", formula1=f'"{",".join(STATUS_OPTIONS)}"', allow_blank=True)
-        dv.error = "Your entry is not in the list."
-        dv.errorTitle = "Invalid Entry"
+        dv = _status_validation()
         ws.add_data_validation(dv)
         
         status_col_index = -1
@@ -37,6 +55,17 @@ def _apply_dropdown_validation(ws):
     except Exception as e:
         log_error(f"Validation error: {e}")
 
+@lru_cache(maxsize=16)
+def _headers_cached(path: str, mtime_ns: int) -> tuple:
+    with closing(load_workbook(path, read_only=True)) as wb:
+        return tuple(next(wb.active.iter_rows(max_row=1, values_only=True), ()))
+
+def read_headers(path: str) -> tuple:
+    """Header row of the active sheet; only re-read when the file's mtime changes."""
+    return _headers_cached(path, os.stat(path).st_mtime_ns)
+
+_validated_mtime = {} # path -> mtime_ns right after the dropdown was last applied
+
 def validate_or_create_excel(path: str):
     """Ensures the Excel file exists and has correct headers."""
     if not os.path.exists(path):
@@ -44,13 +73,15 @@ def validate_or_create_excel(path: str):
         return
 
     try:
-        wb = load_workbook(path)
-        ws = wb.active
-        existing_headers = [cell.value for cell in ws[1]]
+        existing_headers = list(read_headers(path))
         
         if existing_headers == DEFAULT_COLS:
-            _apply_dropdown_validation(ws)
+            # Unchanged since we last validated it: nothing to load or save
+            if _validated_mtime.get(path) == os.stat(path).st_mtime_ns: return
+            wb = load_workbook(path)
+            _apply_dropdown_validation(wb.active)
             wb.save(path)
+            _validated_mtime[path] = os.stat(path).st_mtime_ns
             return
         else:
             # Simple check: if Experience is missing, we might need to recreate or append
@@ -71,15 +102,41 @@ def _create_new_excel(path: str):
     _apply_dropdown_validation(ws)
     wb.save(path)
 
+def _write_new_sheet(path: str, rows, title: str = "Applicants"):
+    """Writes DEFAULT_COLS + rows (with the Status dropdown) in openpyxl write-only mode."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    try:
+        dv = _status_validation()
+        col = get_column_letter(STATUS_IDX + 1)
+        dv.add(f'{col}2:{col}1048576')
+        ws.data_validations.append(dv)
+    except Exception as e:
+        log_error(f"Validation error: {e}")
+    ws.append(DEFAULT_COLS)
+    for row in rows: ws.append(row)
+    wb.save(path)
+
+def _next_serial(ws) -> int:
+    """Next S.No. after the last filled one in an open worksheet."""
+    for row in range(ws.max_row, 1, -1):
+        val = ws.cell(row=row, column=1).value
+        if val is not None: return int(val) + 1
+    return 1
+
+def _iter_serials(ws):
+    """Every filled S.No. in column A of a read-only sheet, in sheet order."""
+    for (val,) in ws.iter_rows(min_row=2, max_col=1, values_only=True):
+        if val is not None: yield val
+
 def get_next_serial_number(path: str) -> int:
     if not os.path.exists(path): return 1
     try:
-        wb = load_workbook(path)
-        ws = wb.active
-        for row in range(ws.max_row, 1, -1):
-            val = ws.cell(row=row, column=1).value
-            if val is not None: return int(val) + 1
-        return 1
+        # Streams column A only, read-only; the last filled S.No. wins
+        last = None
+        with closing(load_workbook(path, read_only=True, data_only=True)) as wb:
+            for last in _iter_serials(wb.active): pass
+        return int(last) + 1 if last is not None else 1
     except Exception:
         return 1
 
@@ -92,60 +149,330 @@ def append_row(path: str, data: dict, status: str = "New Applicant") -> int:
         wb = load_workbook(path)
         ws = wb.active
         
-        serial_num = get_next_serial_number(path)
-        
-        email_val = data.get("Email", "")
-        if isinstance(email_val, list): email_val = ", ".join(email_val)
+        serial_num = _next_serial(ws)
         
-        row = [
-            serial_num,
-            data.get("Name", ""),
-            email_val,
-            data.get("Phone", ""),
-            data.get("Experience", "0"), # New Column
-            status
-        ]
-        ws.append(row)
+        ws.append(_build_row(serial_num, data, status))
         wb.save(path)
         return serial_num
     except Exception as e:
         log_error(f"Excel append failed: {e}")
         raise
 
-def read_all_rows(path: str):
-    """Return list of value-tuples from Excel (skips header)."""
-    if not os.path.exists(path): return []
+def _build_row(serial_num: int, data: dict, status: str) -> list:
+    email_val = data.get("Email", "")
+    if isinstance(email_val, list): email_val = ", ".join(email_val)
+    return [
+        serial_num,
+        data.get("Name", ""),
+        email_val,
+        data.get("Phone", ""),
+        data.get("Experience", "0"),
+        status
+    ]
+
+# Sheets with more data rows than this are never loaded whole by ExcelBatch
+STREAM_REWRITE_ROWS = 10000
+
+# Sheet XML a write-only rewrite would drop: widths, heights, panes, merges, filters, drawings...
+_LOSSY_SHEET_XML = re.compile(
+    rb'<(?:\w+:)?(?:cols|pane|mergeCells|conditionalFormatting|autoFilter|hyperlinks'
+    rb'|drawing|legacyDrawing|tableParts|sheetProtection)\b|\bcustom(?:Height|Format)="(?:1|true)"')
+_CELL_XFS_XML = re.compile(rb'<(?:\w+:)?cellXfs\b[^>]*\bcount="(\d+)"')
+
+def _plain_sheet_rows(path: str):
+    """
+    Row count (header included) of a workbook that a write-only rewrite reproduces
+    exactly: one worksheet, no cell styles, no defined names and none of
+    _LOSSY_SHEET_XML. None for anything else. One raw pass over the sheet XML,
+    counting rows as it goes (write-only saves carry no <dimension>).
+    """
+    try:
+        with zipfile.ZipFile(path) as zf:
+            names = zf.namelist()
+            sheets = [n for n in names if n.startswith(("xl/worksheets/", "xl/chartsheets/")) and n.endswith(".xml")]
+            if len(sheets) != 1 or not sheets[0].startswith("xl/worksheets/"): return None
+            if b"<definedName " in zf.read("xl/workbook.xml"): return None
+            if "xl/styles.xml" in names:
+                m = _CELL_XFS_XML.search(zf.read("xl/styles.xml"))
+                if m and int(m.group(1)) > 1: return None
+            rows, tail = 0, b""
+            with zf.open(sheets[0]) as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    buf = tail + chunk
+                    if _LOSSY_SHEET_XML.search(buf): return None
+                    # Closing tags in this chunk, plus one split across the chunk boundary
+                    rows += chunk.count(b"</row>") + (tail[-5:] + chunk[:5]).count(b"</row>")
+                    tail = buf[-64:]
+            return rows
+    except Exception:
+        return None
+
+def _replace_file(src: str, dst: str, attempts: int = 10):
+    """
+    os.replace, retried with backoff on PermissionError: on Windows it fails while any
+    other thread (tree reload, CSV export) still has the target open for reading.
+    """
+    for attempt in range(attempts):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == attempts - 1: raise
+            time.sleep(min(0.05 * 2 ** attempt, 1.0))
+
+class ExcelBatch:
+    """
+    One workbook handle shared by a whole batch. Rows are appended in memory
+    and written to disk by commit(); every flush_every rows a checkpoint save
+    limits what a crash can lose. Create via open_batch(), which hands every
+    writer of the same file the same batch (so nobody saves over another's rows).
+    A large plain file (over STREAM_REWRITE_ROWS, see _plain_sheet_rows) is not
+    loaded: only new rows and status edits are held, and each save streams the
+    old rows read-only into a write-only copy, edits applied, new rows after.
+    Anything a write-only copy would lose (more sheets, styles, widths...) is
+    always loaded, whatever its size.
+    """
+    def __init__(self, path: str, flush_every: int = 50):
+        self.path = path
+        self.flush_every = flush_every
+        self.lock = threading.RLock()
+        self.users = 0
+        self.commit_hooks = [] # Run under the lock just before every save (e.g. pending DB rows)
+        self.stream = False
+        if not os.path.exists(path): _create_new_excel(path)
+        disk_rows = _plain_sheet_rows(path)
+        if disk_rows is not None and disk_rows - 1 > STREAM_REWRITE_ROWS:
+            with closing(load_workbook(path, read_only=True, data_only=True)) as wb:
+                self.title = wb.active.title
+                serials = list(_iter_serials(wb.active))
+            self.wb = self.ws = None
+            self.stream = True
+            self.rows = [] # Appended since the last save
+            self.edits = {} # S.No. -> Status for rows already on disk
+            self.disk_serials = set(serials)
+            self.next_serial = int(serials[-1]) + 1 if serials else 1
+        else:
+            self.rows = None
+            self.wb = load_workbook(path)
+            self.ws = self.wb.active
+            self.next_serial = _next_serial(self.ws)
+        self.pending = 0
+
+    def append(self, data: dict, status: str = "New Applicant") -> int:
+        """Append a data row (in memory). Returns the new serial number."""
+        with self.lock:
+            serial_num = self.next_serial
+            row = _build_row(serial_num, data, status)
+            if self.stream: self.rows.append(row)
+            else: self.ws.append(row)
+            self.next_serial += 1
+            self.pending += 1
+            
+            if self.flush_every and self.pending % self.flush_every == 0:
+                try: self.commit()
+                except Exception: pass # Logged by commit(); rows stay pending for the next save
+            return serial_num
+
+    def set_status(self, serial_num: int, new_status: str) -> bool:
+        """Change a row's Status in memory (pending until the next commit)."""
+        with self.lock:
+            if self.stream:
+                for row in self.rows:
+                    if row[SNO_IDX] == serial_num:
+                        row[STATUS_IDX] = new_status
+                        self.pending += 1
+                        return True
+                if serial_num in self.disk_serials:
+                    self.edits[serial_num] = new_status
+                    self.pending += 1
+                    return True
+                return False
+            for row in self.ws.iter_rows(min_row=2):
+                if row[SNO_IDX].value == serial_num:
+                    row[STATUS_IDX].value = new_status
+                    self.pending += 1
+                    return True
+            return False
+
+    def commit(self):
+        """Save appended rows: written next to the target, then swapped in atomically."""
+        with self.lock:
+            if not self.pending: return
+            for hook in self.commit_hooks: hook()
+            try:
+                tmp_path = self.path + ".tmp"
+                if self.stream: _write_new_sheet(tmp_path, self._streamed_rows(), self.title)
+                else: self.wb.save(tmp_path)
+                _replace_file(tmp_path, self.path)
+                self.pending = 0
+                if self.stream:
+                    # Now on disk: later saves stream them like any other row
+                    self.disk_serials.update(row[SNO_IDX] for row in self.rows)
+                    self.rows = []
+                    self.edits = {}
+            except Exception as e:
+                log_error(f"Excel batch save failed: {e}")
+                raise
+
+    def _streamed_rows(self):
+        """Rows on disk (status edits applied), then the rows appended since."""
+        with closing(load_workbook(self.path, read_only=True)) as wb:
+            for r in wb.active.iter_rows(min_row=2, values_only=True):
+                if self.edits and r and r[SNO_IDX] in self.edits:
+                    r = list(r) + [None] * (len(DEFAULT_COLS) - len(r))
+                    r[STATUS_IDX] = self.edits[r[SNO_IDX]]
+                yield r
+        yield from self.rows
+
+    def close(self):
+        """Leave the batch; the last writer out releases the workbook (commit first)."""
+        with _batches_lock:
+            self.users -= 1
+            if self.users > 0: return
+            if _batches.get(self.path) is self: del _batches[self.path]
+        with self.lock:
+            if self.wb is not None: self.wb.close()
+            self.wb = self.ws = self.rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class _OpeningBatch:
+    """Holds a file's place in _batches while its ExcelBatch loads (outside _batches_lock)."""
+    def __init__(self):
+        self.ready = threading.Event()
+        self.edits = [] # (S.No., Status) from update_status, applied once the batch is loaded
+
+# path -> the ExcelBatch every writer of that file shares while it is open
+# (or an _OpeningBatch while the first writer is still loading it)
+_batches = {}
+_batches_lock = threading.Lock() # Only guards the dict and refcounts, never a workbook load
+
+def open_batch(path: str, flush_every: int = 50) -> ExcelBatch:
+    """Open (or join) the batch for a file. Use as: with open_batch(path) as batch: ..."""
+    path = os.path.abspath(path)
+    while True:
+        with _batches_lock:
+            batch = _batches.get(path)
+            if batch is None:
+                opening = _batches[path] = _OpeningBatch()
+                break
+            if not isinstance(batch, _OpeningBatch):
+                batch.users += 1
+                return batch
+        batch.ready.wait() # Someone else is loading it: join their batch (or retry if that failed)
+    
+    try:
+        batch = ExcelBatch(path, flush_every)
+    except Exception:
+        with _batches_lock: del _batches[path]
+        opening.ready.set()
+        for serial_num, new_status in opening.edits: _update_status_file(path, serial_num, new_status)
+        raise
+    with _batches_lock:
+        for serial_num, new_status in opening.edits:
+            if not batch.set_status(serial_num, new_status):
+                log_error(f"Status update failed: no row with S.No. {serial_num}")
+        batch.users += 1
+        _batches[path] = batch
+    opening.ready.set()
+    if batch.pending:
+        try: batch.commit()
+        except Exception: pass # Logged by commit(); the edits stay pending for the next save
+    return batch
+
+def update_status(path: str, serial_num: int, new_status: str) -> bool:
+    """Sets a row's Status, through the open batch for this file if there is one."""
+    with _batches_lock:
+        batch = _batches.get(os.path.abspath(path))
+        if isinstance(batch, _OpeningBatch):
+            # Not on disk directly: the batch being loaded would save over it
+            batch.edits.append((serial_num, new_status))
+            return True
+    if batch is None: return _update_status_file(path, serial_num, new_status)
+    try:
+        if not batch.set_status(serial_num, new_status): return False
+        batch.commit()
+        return True
+    except Exception as e:
+        log_error(f"Status update failed: {e}")
+        return False
+
+def iter_all_rows(path: str):
+    """Yield value-tuples from Excel one at a time (skips header), streamed read-only."""
+    if not os.path.exists(path): return
+    wb = load_workbook(path, read_only=True, data_only=True)
     try:
-        wb = load_workbook(path, data_only=True)
         ws = wb.active
-        rows = []
+        n = len(DEFAULT_COLS)
         for r in ws.iter_rows(min_row=2, values_only=True):
-            row_data = list(r)
-            # Pad or truncate to match DEFAULT_COLS length
-            if len(row_data) < len(DEFAULT_COLS):
-                row_data.extend([""] * (len(DEFAULT_COLS) - len(row_data)))
-            rows.append(tuple(row_data[:len(DEFAULT_COLS)]))
-        return rows
+            # Pad or truncate to match DEFAULT_COLS length (the usual full-width row passes as is)
+            if len(r) != n: r = (r + ("",) * n)[:n]
+            yield r
+    finally:
+        wb.close()
+
+def read_all_rows(path: str):
+    """Return list of value-tuples from Excel (skips header)."""
+    try:
+        return list(iter_all_rows(path))
     except Exception:
         return []
 
-def update_status(path: str, serial_num: int, new_status: str) -> bool:
+# --- Imported-content sidecar (<workbook>.hashes, "<hex digest> <S.No.>" per line) ---
+def load_content_hashes(path: str) -> set:
+    """
+    Content hashes of resume files already imported into this workbook. A hash only
+    counts while the row it was saved as is still in the sheet: entries for rows deleted
+    (or a workbook replaced) outside the app are dropped, so those files import again.
+    """
+    try:
+        with open(path + ".hashes", encoding="utf-8") as f:
+            entries = [line.split() for line in f]
+        entries = [(digest, int(sno)) for digest, sno in (e for e in entries if len(e) == 2)]
+        if not entries: return set()
+        
+        serials = set()
+        with closing(load_workbook(path, read_only=True, data_only=True)) as wb:
+            for val in _iter_serials(wb.active):
+                try: serials.add(int(val))
+                except (TypeError, ValueError): pass
+        live = [(digest, sno) for digest, sno in entries if sno in serials]
+        if len(live) != len(entries):
+            # Pruned now, so a S.No. reused later cannot revive a stale entry
+            tmp_path = path + ".hashes.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(f"{digest} {sno}\n" for digest, sno in live)
+            os.replace(tmp_path, path + ".hashes")
+        return {digest for digest, _ in live}
+    except FileNotFoundError:
+        return set()
+    except Exception as e:
+        log_error(f"Could not read content hashes: {e}")
+        return set()
+
+def add_content_hashes(path: str, hashes):
+    """Appends (content hash, S.No.) pairs for rows now saved in the workbook."""
+    if not hashes: return
+    with open(path + ".hashes", "a", encoding="utf-8") as f:
+        f.writelines(f"{digest} {sno}\n" for digest, sno in hashes)
+
+def _update_status_file(path: str, serial_num: int, new_status: str) -> bool:
     if not os.path.exists(path): return False
     try:
         wb = load_workbook(path)
         ws = wb.active
         
-        status_col = -1
-        for idx, cell in enumerate(ws[1], 1):
-            if cell.value == "Status":
-                status_col = idx
-                break
-        
-        if status_col == -1: return False
+        # Headers are DEFAULT_COLS (validate_or_create_excel); just confirm the cell
+        if ws.cell(row=1, column=STATUS_IDX + 1).value != "Status": return False
 
         for row in ws.iter_rows(min_row=2):
-            if row[0].value == serial_num:
-                row[status_col-1].value = new_status
+            if row[SNO_IDX].value == serial_num:
+                row[STATUS_IDX].value = new_status
                 wb.save(path)
                 return True
         return False
@@ -153,37 +480,53 @@ def update_status(path: str, serial_num: int, new_status: str) -> bool:
         log_error(f"Status update failed: {e}")
         return False
 
+def write_workbook_fast(path: str, headers, rows):
+    """
+    Writes a brand-new workbook (headers + rows, no styles) in one streaming pass.
+    Uses xlsxwriter's constant_memory mode when installed, else openpyxl write-only.
+    """
+    if xlsxwriter is not None:
+        wb = xlsxwriter.Workbook(path, {"constant_memory": True, "use_zip64": True})
+        ws = wb.add_worksheet()
+        ws.write_row(0, 0, headers)
+        for r_idx, row in enumerate(rows, 1):
+            ws.write_row(r_idx, 0, row)
+        wb.close()
+        return
+    
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(headers))
+    for row in rows: ws.append(list(row))
+    wb.save(path)
+
 def export_by_status(excel_path: str, destination_folder: str):
     """Exports rows to separate files based on Status."""
     if not os.path.exists(excel_path): return []
 
-    wb_main = load_workbook(excel_path, data_only=True)
-    ws_main = wb_main.active
-    headers = [c.value for c in ws_main[1]]
-    
-    try:
-        status_idx = headers.index("Status")
-    except ValueError:
-        return []
-
     status_map = {} # status -> list of rows
     
-    for row in ws_main.iter_rows(min_row=2, values_only=True):
-        status = row[status_idx]
-        if status:
-            if status not in status_map: status_map[status] = []
-            status_map[status].append(row)
+    # Read-only + values_only: streams tuples instead of building Cell objects
+    with closing(load_workbook(excel_path, read_only=True, data_only=True)) as wb_main:
+        rows_iter = wb_main.active.iter_rows(values_only=True)
+        headers = list(next(rows_iter, ()))
+        
+        try:
+            status_idx = headers.index("Status")
+        except ValueError:
+            return []
+        
+        for row in rows_iter:
+            status = row[status_idx] if status_idx < len(row) else None
+            if status:
+                if status not in status_map: status_map[status] = []
+                status_map[status].append(row)
             
     created_files = []
     for status, rows in status_map.items():
-        wb_new = Workbook()
-        ws_new = wb_new.active
-        ws_new.append(headers)
-        for r in rows: ws_new.append(r)
-        
         safe_name = "".join([c if c.isalnum() else "_" for c in status])
         fname = os.path.join(destination_folder, f"{safe_name}_Candidates.xlsx")
-        wb_new.save(fname)
+        write_workbook_fast(fname, headers, rows)
         created_files.append(fname)
         
     return created_files
@@ -1,31 +1,64 @@
 import re
 import os
+import sys
 import json
+import hashlib
+import itertools
 import requests
-import traceback
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Iterable
 from pathlib import Path 
 
-# Import OCR and image libraries
+# Import text extraction libraries
+# (OCR libraries - pytesseract / Pillow - are imported on first OCR call)
 import fitz  # PyMuPDF
 import docx2txt
-import pytesseract
-from PIL import Image
 import io
 import time 
+import threading
+import multiprocessing
+from collections import OrderedDict
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from utils import log_error
+from utils import log_error, use_direct_logging, file_digest
 
 # ----------------- Configuration / Workspace -----------------
 HOME = Path.home()
 WORKSPACE = HOME / "Desktop" / "ResumeParserWorkspace"
 OCR_TEMP_DIR = WORKSPACE / "ocr_temp"
 OCR_TEMP_DIR.mkdir(parents=True, exist_ok=True)
+# Parsed fields cached by file content hash, and by extracted text hash (one JSON file per key)
+PARSE_CACHE_DIR = WORKSPACE / ".cache"
+PARSE_CACHE_MAX_BYTES = 1 << 30  # 1 GiB, least recently used entries go first
 
 
 # --- Constants ---
 OLLAMA_GENERATE_URL = "http://localhost:11434/api/generate"
 MODEL_NAME = "llama3:8b"
+# The reply is a 4-key JSON object; cap generation and keep the model loaded
+OLLAMA_NUM_PREDICT = 256
+OLLAMA_KEEP_ALIVE = "30m"
+# CPU-only mode (use_gpu=False): keep every layer off the GPU, use all cores
+OLLAMA_CPU_THREADS = os.cpu_count() or 1
+
+# Precompiled patterns
+# Runs of whitespace other than newlines (collapses a whole text in one pass)
+INLINE_SPACE_RE = re.compile(r'[^\S\n]+')
+
+# Number of files whose text is extracted before the LLM pass (env override)
+PARSE_BATCH_SIZE = int(os.environ.get("RESUME_PARSE_BATCH", "16"))
+# Threads used for text extraction (PyMuPDF / Tesseract release the GIL)
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+# docx2txt and PyMuPDF's Python side still hold the GIL, so extraction runs in
+# worker processes where they can be forked. Spawned children (Windows/macOS)
+# would re-import app.py and build a second UI, so those platforms keep threads.
+# The processes are forked once, by start_extract_pool() at startup, before the app
+# has any threads (a fork while another thread holds a lock can deadlock the child).
+EXTRACT_PROCESSES = max(1, (os.cpu_count() or 2) // 2)
+USE_EXTRACT_PROCESSES = sys.platform.startswith("linux")
+# Concurrent Ollama requests per batch (the server queues beyond OLLAMA_NUM_PARALLEL)
+LLM_WORKERS = 4
 
 # --- UPDATED PROMPT FOR EXPERIENCE ---
 LLAMA_PROMPT_TEMPLATE = """
@@ -52,6 +85,8 @@ JSON Output:
 
 def _run_ocr_on_image(image_path_or_bytes):
     """Helper function to run OCR on a single image (from path or bytes)."""
+    import pytesseract
+    from PIL import Image
     
     if not hasattr(_run_ocr_on_image, "tesseract_cmd_path"):
         print("First-time OCR call: Searching for Tesseract-OCR...")
@@ -85,9 +120,10 @@ def _run_ocr_on_image(image_path_or_bytes):
         return ""
 
 
-def extract_text(file_path: str) -> Tuple[str, List[str]]:
+def extract_text(file_path: str, ocr: bool = True) -> Tuple[str, List[str]]:
     """
     Extract text using robust libraries with OCR fallback for PDFs and DOCX.
+    Pass ocr=False to skip embedded images entirely (much faster).
     """
     text = ""
     lines: List[str] = []
@@ -103,6 +139,9 @@ def extract_text(file_path: str) -> Tuple[str, List[str]]:
                     if page_text:
                         text_parts.append(page_text)
                     
+                    if not ocr:
+                        continue
+                    
                     image_list = page.get_images(full=True)
                     if image_list:
                         print(f"Page {page_num+1} has {len(image_list)} images. Running OCR...")
@@ -119,6 +158,10 @@ def extract_text(file_path: str) -> Tuple[str, List[str]]:
                                 
             text = "\n".join(text_parts)
             
+        elif file_lower.endswith('.docx') and not ocr:
+            print(f"Extracting with docx2txt from: {file_path}...")
+            text = docx2txt.process(file_path)
+            
         elif file_lower.endswith('.docx'):
             print(f"Extracting with docx2txt from: {file_path}...")
             unique_img_folder = OCR_TEMP_DIR / f"{Path(file_path).stem}_{int(time.time())}"
@@ -144,13 +187,15 @@ def extract_text(file_path: str) -> Tuple[str, List[str]]:
         if not text or not text.strip():
             return "", []
             
-        lines = text.split('\n')
+        # One regex pass over the whole text instead of one per line
+        lines = INLINE_SPACE_RE.sub(' ', text).split('\n')
 
     except Exception as e:
         log_error(f"Text extraction error for {file_path}: {e}")
         return "", []
         
-    cleaned_lines = [re.sub(r'\s+', ' ', line).strip() for line in lines if line.strip()]
+    cleaned_lines = [line.strip() for line in lines]
+    cleaned_lines = [line for line in cleaned_lines if line]
     cleaned_text = "\n".join(cleaned_lines)
     
     return cleaned_text[:3500], cleaned_lines
@@ -158,7 +203,24 @@ def extract_text(file_path: str) -> Tuple[str, List[str]]:
 
 # --- Ollama Parser Function ---
 
-def _call_ollama(text: str) -> Optional[dict]:
+_http = threading.local()
+
+def _ollama_session() -> requests.Session:
+    """Per-thread keep-alive session, so a batch reuses one connection to Ollama."""
+    session = getattr(_http, "session", None)
+    if session is None:
+        session = _http.session = requests.Session()
+    return session
+
+
+def _ollama_options(use_gpu: bool = True) -> dict:
+    options = {"num_predict": OLLAMA_NUM_PREDICT}
+    # With use_gpu Ollama offloads as many layers as fit in VRAM (its default)
+    if not use_gpu: options.update(num_gpu=0, num_thread=OLLAMA_CPU_THREADS)
+    return options
+
+
+def _call_ollama(text: str, use_gpu: bool = True) -> Optional[dict]:
     """Internal function to call the Ollama API."""
     
     safe_text = text.replace("{", "{{").replace("}", "}}")
@@ -168,12 +230,14 @@ def _call_ollama(text: str) -> Optional[dict]:
         "model": MODEL_NAME,
         "prompt": prompt,
         "format": "json", 
-        "stream": False
+        "stream": False,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": _ollama_options(use_gpu)
     }
 
     try:
         print(f"Sending text to {MODEL_NAME}...")
-        response = requests.post(OLLAMA_GENERATE_URL, json=payload, timeout=120)
+        response = _ollama_session().post(OLLAMA_GENERATE_URL, json=payload, timeout=120)
         response.raise_for_status()
         
         response_data = response.json()
@@ -206,29 +270,246 @@ def _call_ollama(text: str) -> Optional[dict]:
         return None
 
 
-def parse_resume(file_path: str, nlp_model_unused=None) -> Optional[dict]:
+def extract_fields(text: str, file_path: str, use_gpu: bool = True) -> Optional[dict]:
     """
-    Parse resume file using the Llama 3 model via Ollama.
+    Run the LLM over already-extracted resume text and map it to app fields.
     """
-    try:
-        text, lines = extract_text(file_path)
-        if not text or not text.strip():
-            return None
+    parsed_data = _call_ollama(text, use_gpu)
+    
+    if parsed_data is None:
+        return None
 
-        parsed_data = _call_ollama(text)
-        
-        if parsed_data is None:
+    return {
+        "Name": parsed_data.get("name", ""),
+        "Email": parsed_data.get("email", ""),
+        "Phone": parsed_data.get("phone", ""),
+        "Experience": parsed_data.get("experience", "0"), # Default to 0 if missing
+        "ResumePath": os.path.abspath(file_path),
+        "TextSnippet": text[:500]
+    }
+
+
+# --- Parse Cache (content hash -> parsed fields; same BLAKE2b digest as the upload dedup) ---
+
+def _text_key(text: str) -> str:
+    """Cache key for an LLM answer: the extracted text itself, whichever file it came from."""
+    return "t-" + hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+# In-process LRU in front of the JSON files: repeat hits skip the read + json parse
+PARSE_MEMO_SIZE = 2048
+_parse_memo = OrderedDict()  # digest -> stored fields, most recently used last
+_parse_memo_lock = threading.Lock()
+
+
+def _memo_put(digest: str, stored: dict):
+    with _parse_memo_lock:
+        _parse_memo[digest] = stored
+        _parse_memo.move_to_end(digest)
+        if len(_parse_memo) > PARSE_MEMO_SIZE: _parse_memo.popitem(last=False)
+
+
+def _cache_get(digest: str, file_path: str) -> Optional[dict]:
+    """Cached fields for this content, re-pointed at file_path. None on a miss."""
+    cache_path = PARSE_CACHE_DIR / f"{digest}.json"
+    with _parse_memo_lock:
+        stored = _parse_memo.get(digest)
+        if stored is not None: _parse_memo.move_to_end(digest)
+    
+    if stored is None:
+        try:
+            stored = json.loads(cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
             return None
+        _memo_put(digest, stored)
+    
+    try: os.utime(cache_path)  # Mark as recently used (for prune_parse_cache)
+    except OSError: pass
+    data = dict(stored)
+    data["ResumePath"] = os.path.abspath(file_path)
+    return data
 
-        return {
-            "Name": parsed_data.get("name", ""),
-            "Email": parsed_data.get("email", ""),
-            "Phone": parsed_data.get("phone", ""),
-            "Experience": parsed_data.get("experience", "0"), # Default to 0 if missing
-            "ResumePath": os.path.abspath(file_path),
-            "TextSnippet": text[:500]
-        }
-        
+
+def _cache_put(digest: str, data: dict):
+    _memo_put(digest, {k: v for k, v in data.items() if k != "ResumePath"})
+    try:
+        PARSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        stored = {k: v for k, v in data.items() if k != "ResumePath"}
+        (PARSE_CACHE_DIR / f"{digest}.json").write_text(json.dumps(stored), encoding="utf-8")
     except Exception as e:
-        log_error(f"parse_resume exception for {file_path}: {e}")
-        return None
+        log_error(f"Parse cache write failed: {e}")
+
+
+def prune_parse_cache(max_bytes: int = PARSE_CACHE_MAX_BYTES):
+    """Deletes least recently used cache entries until the cache fits in max_bytes."""
+    try:
+        with os.scandir(PARSE_CACHE_DIR) as it:
+            entries = []
+            for e in it:
+                if e.name.endswith(".json"):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+    except OSError:
+        return
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes: break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+# --- Batch Parser ---
+
+def _extract_text_safe(file_path: str, ocr: bool = True):
+    """extract_text for pool workers: returns the text, or the Exception raised."""
+    try:
+        return extract_text(file_path, ocr=ocr)[0]
+    except Exception as e:
+        return e
+
+
+def _prepare_file(file_path: str, ocr: bool = True, digest: Optional[str] = None):
+    """
+    Pool worker: returns (content hash, result) where result is the cached
+    fields (dict), the extracted text, or the Exception raised.
+    digest: the file's file_digest() if the caller already has it.
+    """
+    try:
+        digest = digest or file_digest(file_path)
+    except Exception as e:
+        return None, e
+    
+    cached = _cache_get(digest, file_path)
+    if cached is not None:
+        return digest, cached
+    return digest, _extract_text_safe(file_path, ocr)
+
+
+def _extract_fields_safe(text: str, file_path: str, use_gpu: bool = True):
+    """extract_fields for the LLM pool: returns the fields, or the Exception raised."""
+    try:
+        return extract_fields(text, file_path, use_gpu)
+    except Exception as e:
+        log_error(f"extract_fields exception for {file_path}: {e}")
+        return e
+
+
+_process_pool = None  # Shared by every batch once started; never re-forked
+
+
+def start_extract_pool():
+    """
+    Forks the extraction worker processes (Linux only). Call once at startup,
+    before any thread is started; later batches reuse these workers.
+    """
+    global _process_pool
+    if not USE_EXTRACT_PROCESSES or _process_pool is not None: return
+    try:
+        pool = ProcessPoolExecutor(max_workers=EXTRACT_PROCESSES,
+                                   mp_context=multiprocessing.get_context("fork"),
+                                   initializer=use_direct_logging)
+        pool.submit(int).result()  # A fork pool forks all its workers on first use: do it now
+        _process_pool = pool
+    except Exception as e:
+        log_error(f"Process pool unavailable, using threads: {e}")
+
+
+def _extract_pool():
+    """Executor for phase 1: the startup process pool if it is up, else threads."""
+    if _process_pool is not None: return _process_pool
+    return ThreadPoolExecutor(max_workers=EXTRACT_WORKERS)
+
+
+def _drop_broken_pool(pool):
+    """A worker died (e.g. a malformed PDF). Threads take over: re-forking now would fork a threaded process."""
+    global _process_pool
+    if pool is _process_pool:
+        _process_pool = None
+        log_error("Extraction worker crashed; continuing with threads")
+    pool.shutdown(wait=False)
+    return _extract_pool()
+
+
+def _collect_batch(futures):
+    """Waits for a submitted batch; one failing file (or dead worker) does not sink the rest."""
+    prepared = []
+    for fut in futures:
+        try:
+            prepared.append(fut.result())
+        except Exception as e:
+            prepared.append((None, e))
+    return prepared
+
+
+def iter_parsed_resumes(file_paths: Iterable[str], batch_size: int = PARSE_BATCH_SIZE, ocr: bool = True,
+                        use_gpu: bool = True, llm_workers: int = LLM_WORKERS, digests: Optional[dict] = None):
+    """
+    Two-phase batch parser. Extracts text for a whole batch of files first
+    (concurrently), then runs the LLM over the texts, llm_workers at a time. The next batch is
+    extracted while the LLM works on the current one (never more than one batch ahead). Files whose content was
+    parsed before are served from the parse cache without either step; text parsed before skips the LLM.
+    file_paths may be a lazy iterable (e.g. files still being copied); batches are pulled as needed.
+    digests: optional path -> file_digest() already computed by the caller (those files aren't re-read to hash).
+    Yields (file_path, data) where data is a dict, None (nothing parsed)
+    or the Exception raised for that file.
+    """
+    prune_parse_cache()
+    batch_size = max(1, batch_size)
+    prepare = partial(_prepare_file, ocr=ocr)
+    known = digests if digests is not None else {}
+    pool = _extract_pool()
+    llm_pool = ThreadPoolExecutor(max_workers=max(1, llm_workers))
+    paths = iter(file_paths)
+    batch = list(itertools.islice(paths, batch_size))
+    pending = [pool.submit(prepare, fp, digest=known.get(fp)) for fp in batch]
+    try:
+        while batch:
+            # Phase 1: hash + cache lookup / text extraction, in input order
+            prepared = _collect_batch(pending)
+            if any(isinstance(r, BrokenProcessPool) for _, r in prepared):
+                pool = _drop_broken_pool(pool)
+            
+            # Phase 2: field extraction (LLM), all texts submitted up front; results yielded in order.
+            # Text seen before (another copy/format of the same resume, or twice in this batch)
+            # reuses that answer instead of a second LLM call
+            answers = {}  # text key -> cached fields or Future
+            keys = []
+            for fp, (digest, result) in zip(batch, prepared):
+                if not (isinstance(result, str) and result.strip()):
+                    keys.append(None)
+                    continue
+                tkey = _text_key(result)
+                if tkey not in answers:
+                    hit = _cache_get(tkey, fp)
+                    answers[tkey] = hit if hit is not None else llm_pool.submit(_extract_fields_safe, result, fp, use_gpu)
+                keys.append(tkey)
+            
+            # Keep the extractors busy on the next batch while the LLM works (pulling it may
+            # wait on a lazy source, so only after this batch's LLM work is already queued)
+            nxt = list(itertools.islice(paths, batch_size))
+            pending = [pool.submit(prepare, fp, digest=known.get(fp)) for fp in nxt]
+            
+            for fp, (digest, result), tkey in zip(batch, prepared, keys):
+                if isinstance(result, (dict, Exception)):
+                    yield fp, result
+                    continue
+                if tkey is None:
+                    yield fp, None
+                    continue
+                data = answers[tkey]
+                if isinstance(data, Future):
+                    data = answers[tkey] = data.result()
+                    if data and not isinstance(data, Exception): _cache_put(tkey, data)
+                if data and not isinstance(data, Exception):
+                    data = dict(data, ResumePath=os.path.abspath(fp))
+                    _cache_put(digest, data)
+                yield fp, data
+            batch = nxt
+    finally:
+        llm_pool.shutdown(wait=False, cancel_futures=True)
+        for fut in pending: fut.cancel()  # Prefetched batch of a generator closed early
+        if pool is not _process_pool: pool.shutdown(cancel_futures=True)
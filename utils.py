@@ -1,9 +1,25 @@
 import os
 import json
+import re
+import hashlib
+import stat
 import traceback
-import sys
+import shutil
+import queue
+import atexit
+import logging
+import threading
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import requests # New import
 
+# Optional: rapidfuzz adds a fuzzy pass to duplicate-by-name matching
+try:
+    from rapidfuzz import process as fuzz_process
+    from rapidfuzz.distance import Levenshtein
+except ImportError:
+    fuzz_process = None
+
 CONFIG_FILE = "config.json"
 LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "errors.log")
@@ -16,14 +32,52 @@ DEFAULT_CONFIG = {
 def ensure_dirs():
     os.makedirs(LOG_DIR, exist_ok=True)
 
-def log_error(msg: str):
-    """Logs an error message to the log file."""
+_logger = None
+_logger_lock = threading.Lock()
+
+def _get_logger():
+    """
+    Builds the error logger once. Records go into a queue and a background
+    QueueListener writes them to a rotating log file, off the caller's thread.
+    """
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                ensure_dirs()
+                file_handler = RotatingFileHandler(LOG_FILE, maxBytes=5_000_000, backupCount=3, encoding="utf-8")
+                # The 'msg' variable already contains the full traceback.
+                file_handler.setFormatter(logging.Formatter("%(message)s\n" + "-" * 80))
+                
+                log_q = queue.Queue(-1)
+                listener = QueueListener(log_q, file_handler)
+                listener.start()
+                atexit.register(listener.stop)  # Flushes pending records on exit
+                
+                logger = logging.getLogger("extractor")
+                logger.setLevel(logging.ERROR)
+                logger.propagate = False
+                logger.addHandler(QueueHandler(log_q))
+                _logger = logger
+    return _logger
+
+def use_direct_logging():
+    """
+    For worker processes: write records straight to the file. A forked child
+    has no listener thread, and atexit does not run there to flush a queue.
+    """
+    global _logger
     ensure_dirs()
+    file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter("%(message)s\n" + "-" * 80))
+    logger = logging.getLogger("extractor")
+    logger.handlers = [file_handler]
+    _logger = logger
+
+def log_error(msg: str):
+    """Logs an error message to the log file (written by a background thread)."""
     try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            # FIX: The old line was too complex.
-            # The 'msg' variable already contains the full traceback.
-            f.write(f"{msg}\n{'-'*80}\n")
+        _get_logger().error(msg)
     except Exception as e:
         # If logging fails, print to console as a fallback
         print("--- FATAL LOGGING ERROR ---")
@@ -31,6 +85,137 @@ def log_error(msg: str):
         print(f"Original message: {msg}")
         print("--- END ---")
 
+def normalize_email(email) -> str:
+    """Canonical lookup key for an email: stripped and lower-cased ("" if missing)."""
+    if isinstance(email, list): email = email[0] if email else ""
+    return (email or "").strip().lower()
+
+_EMAIL_SPLIT_RE = re.compile(r"[\s,;]+")
+
+def email_set(email) -> frozenset:
+    """
+    Every address in a parsed Email field (a list, or one string holding
+    several separated by commas/semicolons/spaces), canonicalized once.
+    Only tokens containing "@" count, so filler like "not provided" can't match.
+    Also contains normalize_email(email) so combined keys still match.
+    """
+    parts = email if isinstance(email, list) else [email or ""]
+    found = {p for part in parts for p in _EMAIL_SPLIT_RE.split(str(part).lower()) if "@" in p}
+    key = normalize_email(email)
+    if key: found.add(key)
+    return frozenset(found)
+
+def normalize_name(name) -> str:
+    """Lookup key for a name: case-folded, runs of whitespace collapsed ("John  Smith" == "john smith")."""
+    return " ".join(str(name or "").split()).casefold()
+
+NAME_MATCH_CUTOFF = 0.9
+
+def best_name_match(key: str, names):
+    """
+    The entry of names (normalized keys) closest to key, if rapidfuzz is installed
+    and one is at least NAME_MATCH_CUTOFF similar (normalized Levenshtein); else None.
+    One C-level pass over all names.
+    """
+    if fuzz_process is None or not key: return None
+    hit = fuzz_process.extractOne(key, names, scorer=Levenshtein.normalized_similarity,
+                                  score_cutoff=NAME_MATCH_CUTOFF)
+    return hit[0] if hit else None
+
+# --- Folder scan ---
+RESUME_EXTS = (".pdf", ".docx")
+
+def iter_resumes(root):
+    """
+    Yields resume paths under root, recursively. Uses os.scandir with an
+    explicit stack: DirEntry type checks come from the directory listing
+    itself, so no extra stat per file.
+    """
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        # Type first (a folder may be named like "cv.pdf"); both come from the listing
+                        if e.is_dir(follow_symlinks=False): stack.append(e.path)
+                        elif e.name.lower().endswith(RESUME_EXTS) and e.is_file(): yield e.path
+                    except OSError:
+                        continue
+        except OSError as e:
+            log_error(f"Could not scan folder {d}: {e}")
+
+# --- File copy helper ---
+COPY_BUFSIZE = 1 << 20  # 1 MiB
+
+def file_digest(path) -> str:
+    """
+    BLAKE2b-128 of the file contents (hex). Memoized on (path, size, mtime),
+    so uploading the same unchanged file again this session costs one stat().
+    """
+    st = os.stat(path)
+    return _digest_of(os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+@lru_cache(maxsize=4096)
+def _digest_of(path, size, mtime_ns) -> str:
+    """Reads the whole file in COPY_BUFSIZE chunks; size/mtime only key the cache."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_BUFSIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+# Windows: CopyFileW copies inside the kernel (and keeps timestamps/attributes)
+try:
+    import ctypes
+    _CopyFileW = ctypes.windll.kernel32.CopyFileW if os.name == "nt" else None
+except Exception:
+    _CopyFileW = None
+
+def fast_copy(src, dst):
+    """
+    Copies file contents src -> dst (no metadata, except on Windows).
+    Uses CopyFileW on Windows, then clears the read-only attribute it carries over
+    (the copy is the app's own and may be deleted later). Elsewhere tells the OS the source is read
+    sequentially (posix_fadvise) and uses copy_file_range (in-kernel, or a
+    reflink on btrfs/xfs), then sendfile where supported, else a 1 MiB buffered copy.
+    """
+    if _CopyFileW is not None and _CopyFileW(str(src), str(dst), False):
+        os.chmod(dst, stat.S_IREAD | stat.S_IWRITE)
+        return
+    
+    flags = os.O_RDONLY | getattr(os, "O_BINARY", 0) | getattr(os, "O_SEQUENTIAL", 0)
+    with os.fdopen(os.open(src, flags), "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            os.posix_fadvise(fsrc.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except (AttributeError, OSError):
+            pass
+        
+        size = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                while offset < size:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - offset, offset, offset)
+                    if n == 0: break
+                    offset += n
+                if offset >= size: return
+            except OSError:
+                pass # EXDEV/ENOSYS/EINVAL...: carry on with sendfile from here
+            fdst.seek(offset) # copy_file_range used explicit offsets; sendfile writes at the file position
+        try:
+            while offset < size:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                if sent == 0: break
+                offset += sent
+            return
+        except (AttributeError, OSError):
+            # No file-to-file sendfile here (e.g. Windows/macOS): finish buffered
+            fsrc.seek(offset)
+            fdst.seek(offset)
+        shutil.copyfileobj(fsrc, fdst, length=COPY_BUFSIZE)
+
 # Config helpers
 def load_config():
     """Loads config.json, creating it with defaults if it doesn't exist."""